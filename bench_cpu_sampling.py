@@ -0,0 +1,87 @@
+# CPU 刷新路径耗时测试：采样 + 拼接富文本 + QLabel 排版，对比不同核心数。
+# 需要与运行 CPNya 相同的环境 (Windows + PySide6 + psutil + pynvml)，
+# 因为导入 main 会加载 PySide6、pynvml 和 ctypes.windll。
+import sys
+import time
+from collections import namedtuple
+
+import psutil
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QApplication, QLabel
+
+from main import CpuSampler, cpu_info_text
+
+# 与 Windows 上 psutil.cpu_times() 字段一致
+scputimes = namedtuple('scputimes', ['user', 'system', 'idle', 'interrupt', 'dpc'])
+
+CORE_COUNTS = (8, 16, 32, 64, 128, 256)
+ROUNDS = 200
+
+
+def fake_times(n, tick):
+    return [scputimes(100.0 + tick * (0.1 + i % 7 * 0.05), 50.0 + tick * 0.1, 1000.0 + tick * 0.6, 1.0, 1.0)
+            for i in range(n)]
+
+
+def make_label():
+    f = QFont("Segoe UI", 10)
+    f.setStyleStrategy(QFont.PreferAntialias)
+    label = QLabel()
+    label.setFont(f)
+    label.setTextFormat(Qt.RichText)
+    return label
+
+
+def bench_path(label, sampler, frames):
+    # 返回 (采样, 拼接文本, 排版) 三段的平均耗时
+    t_sample = t_text = t_layout = 0.0
+    for times in frames:
+        t0 = time.perf_counter()
+        sampler.sample(times)
+        t1 = time.perf_counter()
+        text = cpu_info_text(sampler, True)
+        t2 = time.perf_counter()
+        label.setText(text)
+        label.adjustSize()
+        t3 = time.perf_counter()
+        t_sample += t1 - t0
+        t_text += t2 - t1
+        t_layout += t3 - t2
+    n = len(frames)
+    return t_sample / n, t_text / n, t_layout / n
+
+
+def report(name, sample, text, layout):
+    total = sample + text + layout
+    print(f"  {name:>10}: 采样 {sample * 1e6:8.1f} us  文本 {text * 1e6:8.1f} us  "
+          f"排版 {layout * 1e6:9.1f} us  合计 {total * 1e3:6.2f} ms  (100 ms 刷新占用 {total / 0.1 * 100:5.2f}%)")
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    label = make_label()
+
+    print("模拟核心数 (cpu_times 数据为构造值，不含系统调用):")
+    for n in CORE_COUNTS:
+        frames = [fake_times(n, tick) for tick in range(ROUNDS + 1)]
+        sampler = CpuSampler(frames[0])
+        report(f"{n} 核", *bench_path(label, sampler, frames[1:]))
+
+    print(f"本机 {psutil.cpu_count()} 线程 (含 cpu_times(percpu=True) 系统调用):")
+    sampler = CpuSampler()
+    frames = []
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        frames.append(psutil.cpu_times(percpu=True))
+    t_read = (time.perf_counter() - t0) / ROUNDS
+    sample, text, layout = bench_path(label, sampler, frames)
+    report("本机", t_read + sample, text, layout)
+
+    psutil.cpu_percent()
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        psutil.cpu_percent()
+        psutil.cpu_percent(percpu=True)
+    old = (time.perf_counter() - t0) / ROUNDS
+    print(f"  旧方式 cpu_percent() + cpu_percent(percpu=True) 仅采样: {old * 1e6:8.1f} us")
@@ -26,6 +26,8 @@ CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 PRESENTMON_NAME = "PresentMon.exe"
 PRESENTMON_DEST = os.path.join(CONFIG_DIR, PRESENTMON_NAME)
 
+REFRESH_INTERVALS = (1000, 500, 250, 100)
+
 dwm_mode = False
 
 
@@ -53,22 +55,101 @@ def ensure_presentmon_in_appdata():
         return True
 
 
+# 已缓存为 dwm 模式的程序过一段时间后重新尝试 PID 模式，一次超时即续期
+FPS_CACHE_RETRY_SECONDS = 24 * 3600
+# 超过这么久没有续期的缓存项会被清理
+FPS_CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+# PID 模式连续超时这么多次才缓存为 dwm 模式
+FPS_DWM_TIMEOUT_LIMIT = 2
+
+
 class PresentMonRunner:
-    def __init__(self):
+    def __init__(self, capture_cache=None):
         self.process = None
         self.running = False
         self.current_fps = 0
         self.check_timeout_running = False
+        # exe 路径 -> {"mode": "dwm", "cached_at": 时间戳}，只保存需要 dwm 模式的程序，随配置保存
+        self.capture_cache = dict(capture_cache or {})
+        self.cache_dirty = False
+        self.cache_lock = threading.Lock()
+        # 保证切换进程和超时回退到 dwm 模式不会同时进行
+        self.launch_lock = threading.Lock()
+        # exe 路径 -> PID 模式连续超时次数，不保存
+        self.pid_timeouts = {}
+        # pid -> (psutil.Process, exe 路径)，进程退出后失效
+        self.pid_exe_cache = {}
+
+    def resolve_exe(self, pid):
+        cached = self.pid_exe_cache.get(pid)
+        if cached:
+            proc, exe = cached
+            if proc.is_running():
+                return exe
+            del self.pid_exe_cache[pid]
+        # 顺便清理已退出的进程
+        for old_pid in [k for k, (proc, _) in self.pid_exe_cache.items() if not proc.is_running()]:
+            del self.pid_exe_cache[old_pid]
+        try:
+            proc = psutil.Process(pid)
+            exe = os.path.normcase(proc.exe())
+        except (psutil.Error, OSError):
+            return None
+        if not exe:
+            return None
+        self.pid_exe_cache[pid] = (proc, exe)
+        return exe
+
+    def use_dwm(self, exe):
+        if not exe:
+            return False
+        with self.cache_lock:
+            entry = self.capture_cache.get(exe)
+        if not entry:
+            return False
+        return time.time() - entry.get("cached_at", 0) <= FPS_CACHE_RETRY_SECONDS
+
+    def record_pid_ok(self, exe):
+        if not exe:
+            return
+        with self.cache_lock:
+            self.pid_timeouts.pop(exe, None)
+            if self.capture_cache.pop(exe, None) is not None:
+                self.cache_dirty = True
 
-    def start(self, pid):
-        ok = ensure_presentmon_in_appdata()
-        if not ok:
-            print("[ERROR] PresentMon.exe 未找到，FPS 功能不可用")
+    def record_pid_timeout(self, exe):
+        if not exe:
             return
-        print(f"[DEBUG] PRESENTMON_DEST: {PRESENTMON_DEST}")
-        self.stop()
+        with self.cache_lock:
+            # 已缓存过 dwm 模式（包括已过期的）的程序，重新尝试时一次超时即续期
+            if exe in self.capture_cache:
+                count = FPS_DWM_TIMEOUT_LIMIT
+            else:
+                count = self.pid_timeouts.get(exe, 0) + 1
+            self.pid_timeouts[exe] = count
+            if count < FPS_DWM_TIMEOUT_LIMIT:
+                return
+            now = time.time()
+            for old_exe in [k for k, v in self.capture_cache.items()
+                            if now - v.get("cached_at", 0) > FPS_CACHE_MAX_AGE_SECONDS]:
+                del self.capture_cache[old_exe]
+            self.capture_cache[exe] = {"mode": "dwm", "cached_at": int(now)}
+            self.cache_dirty = True
+
+    def export_capture_cache(self):
+        with self.cache_lock:
+            return dict(self.capture_cache)
+
+    def mark_cache_saved(self, saved):
+        with self.cache_lock:
+            # 保存期间缓存又有变化时保持 dirty，下次再保存
+            if self.capture_cache == saved:
+                self.cache_dirty = False
+
+    def _launch(self, target_args, exe, mode):
+        global dwm_mode
         self.process = subprocess.Popen(
-            [PRESENTMON_DEST, '--stop_existing_session', '--process_id', str(pid), '--output_stdout'],
+            [PRESENTMON_DEST, '--stop_existing_session', *target_args, '--output_stdout'],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
@@ -77,14 +158,33 @@ class PresentMonRunner:
             creationflags=CREATE_NO_WINDOW
         )
         self.running = True
-        self.check_timeout_running = True
+        dwm_mode = mode == "dwm"
         self.last_output_time = time.time()
-        threading.Thread(target=self._read_output, daemon=True).start()
-        threading.Thread(target=self._check_timeout, daemon=True).start()
+        threading.Thread(target=self._read_output, args=(self.process, exe, mode), daemon=True).start()
 
-    def _read_output(self):
+    def start(self, pid):
+        ok = ensure_presentmon_in_appdata()
+        if not ok:
+            print("[ERROR] PresentMon.exe 未找到，FPS 功能不可用")
+            return
+        print(f"[DEBUG] PRESENTMON_DEST: {PRESENTMON_DEST}")
+        exe = self.resolve_exe(pid)
+        with self.launch_lock:
+            self.stop()
+            if self.use_dwm(exe):
+                print(f"[INFO] 已缓存 {exe} 为dwm.exe进程模式")
+                self._launch(['--process_name', 'dwm.exe'], exe, "dwm")
+                return
+            self._launch(['--process_id', str(pid)], exe, "pid")
+            self.check_timeout_running = True
+            threading.Thread(target=self._check_timeout, args=(self.process, exe), daemon=True).start()
+
+    def _read_output(self, process, exe, mode):
+        remembered = False
         try:
-            for line in self.process.stdout:
+            for line in process.stdout:
+                if process is not self.process:
+                    break
                 self.last_output_time = time.time()
                 fields = line.strip().split(",")
                 if len(fields) > 10:
@@ -92,29 +192,25 @@ class PresentMonRunner:
                     try:
                         frame_time = float(frame_time_str)
                         self.current_fps = 1000 / frame_time
-                    except ValueError:
-                        pass
+                    except (ValueError, ZeroDivisionError):
+                        continue
+                    if mode == "pid" and not remembered:
+                        self.record_pid_ok(exe)
+                        remembered = True
         except Exception as e:
             print(f"[ERROR] 读取 PresentMon 输出出错: {e}")
 
-    def _check_timeout(self):
-        while self.check_timeout_running:
+    def _check_timeout(self, process, exe):
+        while self.check_timeout_running and process is self.process:
             if time.time() - self.last_output_time > 1:
-                print("[INFO] PID模式超时，切换到dwm.exe进程模式")
-                self.stop()
-                self.process = subprocess.Popen(
-                    [PRESENTMON_DEST, '--stop_existing_session', '--process_name', 'dwm.exe', '--output_stdout'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True,
-                    creationflags=CREATE_NO_WINDOW
-                )
-                global dwm_mode
-                dwm_mode = True
-                self.last_output_time = time.time()
-                threading.Thread(target=self._read_output, daemon=True).start()
+                with self.launch_lock:
+                    # start() 可能刚切换到新进程
+                    if not self.check_timeout_running or process is not self.process:
+                        break
+                    print("[INFO] PID模式超时，切换到dwm.exe进程模式")
+                    self.stop()
+                    self.record_pid_timeout(exe)
+                    self._launch(['--process_name', 'dwm.exe'], exe, "dwm")
                 break
             time.sleep(0.1)
 
@@ -127,6 +223,61 @@ class PresentMonRunner:
             self.process.wait()
             self.running = False
 
+# --------- CPU 采样 ---------
+class CpuSampler:
+    """每次刷新只读取一次 cpu_times(percpu=True)，一轮循环算出总占用和每核占用。"""
+
+    def __init__(self, times=None):
+        self.total = 0.0
+        self.user = 0.0
+        self.system = 0.0
+        self.iowait = 0.0
+        self._reset(psutil.cpu_times(percpu=True) if times is None else times)
+
+    def _reset(self, times):
+        # 预分配，每次刷新原地更新，避免高核心数机器上反复创建列表；以当前读数为基线
+        self.prev_all = [sum(t) for t in times]
+        self.prev_iowait = [getattr(t, 'iowait', 0.0) for t in times]
+        self.prev_busy = [a - t.idle - w for a, t, w in zip(self.prev_all, times, self.prev_iowait)]
+        self.prev_user = [t.user for t in times]
+        self.prev_system = [t.system for t in times]
+        self.percore = [0.0] * len(times)
+
+    def sample(self, times=None):
+        if times is None:
+            times = psutil.cpu_times(percpu=True)
+        if len(times) != len(self.percore):
+            # CPU 热插拔等情况，重新建立基线
+            self._reset(times)
+            return self.total
+        prev_all, prev_busy = self.prev_all, self.prev_busy
+        prev_user, prev_system, prev_iowait = self.prev_user, self.prev_system, self.prev_iowait
+        percore = self.percore
+        sum_all = sum_busy = sum_user = sum_system = sum_iowait = 0.0
+        for i, t in enumerate(times):
+            all_t = sum(t)
+            iowait = getattr(t, 'iowait', 0.0)
+            busy = all_t - t.idle - iowait
+            d_all = all_t - prev_all[i]
+            d_busy = busy - prev_busy[i]
+            percore[i] = min(max(d_busy / d_all * 100, 0.0), 100.0) if d_all > 0 else 0.0
+            sum_all += d_all
+            sum_busy += d_busy
+            sum_user += t.user - prev_user[i]
+            sum_system += t.system - prev_system[i]
+            sum_iowait += iowait - prev_iowait[i]
+            prev_all[i] = all_t
+            prev_busy[i] = busy
+            prev_user[i] = t.user
+            prev_system[i] = t.system
+            prev_iowait[i] = iowait
+        if sum_all > 0:
+            self.total = min(max(sum_busy / sum_all * 100, 0.0), 100.0)
+            self.user = min(max(sum_user / sum_all * 100, 0.0), 100.0)
+            self.system = min(max(sum_system / sum_all * 100, 0.0), 100.0)
+            self.iowait = min(max(sum_iowait / sum_all * 100, 0.0), 100.0)
+        return self.total
+
 # --------- 单实例检测 ---------
 def is_another_instance_running(key="OverlaySingleton"):
     socket = QLocalSocket()
@@ -147,8 +298,13 @@ def create_instance_lock(key="OverlaySingleton"):
 def load_config():
     cfg = {}
     if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
+        try:
+            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+        except (OSError, ValueError):
+            cfg = {}
+        if not isinstance(cfg, dict):
+            cfg = {}
     # 默认项
     cfg.setdefault('show_cpu', True)
     cfg.setdefault('show_percore', True)
@@ -159,6 +315,17 @@ def load_config():
     cfg.setdefault('show_fps', True)
     cfg.setdefault('memory_unit', 'GB')
     cfg.setdefault('position_preset', '左上')
+    interval = cfg.get('refresh_interval')
+    if not isinstance(interval, int) or interval not in REFRESH_INTERVALS:
+        cfg['refresh_interval'] = 1000
+    cache = cfg.get('fps_capture_cache')
+    if not isinstance(cache, dict):
+        cache = {}
+    cfg['fps_capture_cache'] = {
+        exe: entry for exe, entry in cache.items()
+        if isinstance(entry, dict) and entry.get('mode') == 'dwm'
+        and isinstance(entry.get('cached_at'), (int, float)) and not isinstance(entry.get('cached_at'), bool)
+    }
     # overlay 位置
     pos = cfg.get('overlay_pos')
     if not isinstance(pos, list) or len(pos) != 2:
@@ -168,8 +335,10 @@ def load_config():
 
 def save_config(cfg):
     os.makedirs(CONFIG_DIR, exist_ok=True)
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+    tmp_file = CONFIG_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
         json.dump(cfg, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_file, CONFIG_FILE)
 
 # --------- 工具函数 ---------
 def lerp_color(c1, c2, t):
@@ -215,13 +384,22 @@ def temperature_color(temp: float, min_temp=30, max_temp=90) -> str:
         r,g,b = lerp_color(orange,red,(t-2/3)/(1/3))
     return f"#{r:02X}{g:02X}{b:02X}"
 
+def cpu_info_text(sampler, show_percore):
+    tot = sampler.total
+    cpu_str = f"CPU: <span style='color:{color_smooth_gradient(tot)};'>{tot:.0f}%</span>"
+    if show_percore:
+        pcs_str = " ".join(f"<span style='color:{color_smooth_gradient(p)};'>{p:.0f}%</span>" for p in sampler.percore)
+        cpu_str += f" (<span style='color:white;'>{pcs_str}</span>)"
+    return cpu_str
+
 # --------- 设置窗口 ---------
 class SettingsDialog(QDialog):
     def __init__(self, config=None, overlay=None):
         super().__init__()
         self.overlay = overlay
+        self.config = config or {}
         self.setWindowTitle("设置")
-        self.setFixedSize(300,400)
+        self.setFixedSize(300,460)
 
         if darkdetect.isDark():
             #深色模式
@@ -255,6 +433,8 @@ class SettingsDialog(QDialog):
         self.pos_combo.addItems(["左上", "左下", "右上", "右下"])
         self.unit_combo      = QComboBox()
         self.unit_combo.addItems(["GB", "MB"])
+        self.refresh_combo   = QComboBox()
+        self.refresh_combo.addItems([f"{ms} ms" for ms in REFRESH_INTERVALS])
         self.pos_hint_label = QLabel("左下/右下 建议配合自动隐藏任务栏使用哦~")
         self.pos_hint_label.setStyleSheet("color: gray; font-size: 10pt;")
 
@@ -272,12 +452,16 @@ class SettingsDialog(QDialog):
             idx = self.unit_combo.findText(unit)
             self.pos_combo.setCurrentIndex(idx_pos if idx_pos >= 0 else 0)
             self.unit_combo.setCurrentIndex(idx if idx >= 0 else 0)
+            interval = config.get("refresh_interval", 1000)
+            idx_refresh = self.refresh_combo.findText(f"{interval} ms")
+            self.refresh_combo.setCurrentIndex(idx_refresh if idx_refresh >= 0 else 0)
         else:
             for cb in (self.cpu_checkbox, self.percore_checkbox, self.memory_checkbox,
                        self.gpu_checkbox, self.temp_checkbox, self.vram_checkbox, self.fps_checkbox):
                 cb.setChecked(True)
             self.pos_combo.setCurrentIndex(0)
             self.unit_combo.setCurrentIndex(0)
+            self.refresh_combo.setCurrentIndex(0)
 
         ok_btn = QPushButton("确定")
         ok_btn.clicked.connect(self.accept)
@@ -295,6 +479,10 @@ class SettingsDialog(QDialog):
         layout.addWidget(QLab("内存单位:"))
         layout.addWidget(self.unit_combo)
         self.unit_combo.currentTextChanged.connect(self.update_overlay_preview)
+        layout.addSpacing(10)
+        layout.addWidget(QLab("刷新间隔:"))
+        layout.addWidget(self.refresh_combo)
+        self.refresh_combo.currentTextChanged.connect(self.update_overlay_preview)
         layout.addStretch()
         layout.addWidget(self.pos_hint_label, alignment=Qt.AlignCenter)
         layout.addWidget(ok_btn, alignment=Qt.AlignCenter)
@@ -359,7 +547,9 @@ class SettingsDialog(QDialog):
             'show_vram':    self.vram_checkbox.isChecked(),
             'show_fps':     self.fps_checkbox.isChecked(),
             'memory_unit':  self.unit_combo.currentText(),
-            'position_preset': self.pos_combo.currentText()
+            'position_preset': self.pos_combo.currentText(),
+            'refresh_interval': int(self.refresh_combo.currentText().split()[0]),
+            'fps_capture_cache': self.config.get('fps_capture_cache', {})
         }
         return settings
 
@@ -433,10 +623,12 @@ class OverlayWindow(QWidget):
         self.anim.setEasingCurve(QEasingCurve.OutCubic)
         self.hidden = False
 
+        self.cpu_sampler = CpuSampler()
+
         # 定时
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_info)
-        self.timer.start(1000)
+        self.timer.start(self.settings.get('refresh_interval', 1000))
 
         self.mouse_timer = QTimer(self)
         self.mouse_timer.timeout.connect(self.check_mouse)
@@ -499,14 +691,13 @@ class OverlayWindow(QWidget):
 
     def update_info(self):
         parts = []
+        interval = self.settings.get('refresh_interval', 1000)
+        if self.timer.interval() != interval:
+            self.timer.setInterval(interval)
+
         if self.settings['show_cpu']:
-            tot = psutil.cpu_percent()
-            cpu_str = f"CPU: <span style='color:{color_smooth_gradient(tot)};'>{tot:.0f}%</span>"
-            if self.settings['show_percore']:
-                pcs = psutil.cpu_percent(percpu=True)
-                pcs_str = " ".join(f"<span style='color:{color_smooth_gradient(p)};'>{p:.0f}%</span>" for p in pcs)
-                cpu_str += f" (<span style='color:white;'>{pcs_str}</span>)"
-            parts.append(cpu_str)
+            self.cpu_sampler.sample()
+            parts.append(cpu_info_text(self.cpu_sampler, self.settings['show_percore']))
 
         if self.settings['show_memory']:
             m = psutil.virtual_memory()
@@ -542,7 +733,7 @@ class OverlayWindow(QWidget):
 
         if self.settings['show_fps']:
             if not hasattr(self, 'pm_runner'):
-                self.pm_runner = PresentMonRunner()
+                self.pm_runner = PresentMonRunner(self.settings.get('fps_capture_cache'))
                 self.last_pid = None
             
             current_pid = get_foreground_window_pid()
@@ -558,6 +749,16 @@ class OverlayWindow(QWidget):
                 fps_str += " <span style='color:white;'>(dwm.exe)</span>"
             parts.append(fps_str)
 
+            if self.pm_runner.cache_dirty and not self.settings_dialog_open:
+                cache = self.pm_runner.export_capture_cache()
+                self.settings['fps_capture_cache'] = cache
+                try:
+                    save_config(self.settings)
+                except OSError as e:
+                    print(f"[ERROR] 保存 FPS 缓存失败: {e}")
+                else:
+                    self.pm_runner.mark_cache_saved(cache)
+
         self.label.setText("<br>".join(parts))
         self.label.adjustSize()
         if not getattr(self, 'hidden', False) and not (hasattr(self, 'anim') and self.anim.state() == QPropertyAnimation.Running):